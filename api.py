@@ -1,13 +1,36 @@
+import os
+import secrets
 import uvicorn
-from fastapi import FastAPI
+from typing import Optional
+from contextlib import asynccontextmanager
+from email.utils import format_datetime, parsedate_to_datetime
+from fastapi import FastAPI, Header, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from src.orchestration.master_agent import get_master_chain
-from src.schemas.final_report_schema import FinalReport
+from fastapi.responses import ORJSONResponse, FileResponse
+from src.orchestration.report_service import get_report, backfill_analytics
+from src.storage.report_store import StoredReport
+from src.rendering.renderer import artifact_path, is_rendering
+from src.knowledge.drug_index import resolve, refresh as refresh_drug_index, get_drug_index
+from src.storage.analytics import get_analytics_store
+from src.storage.access_log import get_access_log
+
+# Admin endpoints are disabled unless a token is configured.
+ADMIN_TOKEN = os.getenv("PHARMAMIND_ADMIN_TOKEN")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Reports stored before the analytics tables existed still count.
+    if get_analytics_store().is_empty():
+        backfill_analytics()
+    yield
+    get_access_log().flush()
 
 app = FastAPI(
     title="PharmaMind API",
     description="API for running the PharmaMind drug repurposing agent.",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
 app.add_middleware(
@@ -16,33 +39,148 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "Last-Modified"],
 )
 
+def _cache_headers(stored: StoredReport) -> dict:
+    return {
+        "ETag": stored.etag,
+        "Last-Modified": format_datetime(stored.created_at, usegmt=True),
+        "Cache-Control": "no-cache",
+        "X-Report-Version": str(stored.version),
+    }
+
+def _is_not_modified(request: Request, stored: StoredReport) -> bool:
+    # If-None-Match takes precedence over If-Modified-Since (RFC 9110).
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        return "*" in tags or stored.etag in tags
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is not None:
+        try:
+            return stored.created_at <= parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+
+    return False
+
 @app.get("/")
 async def get_root():
     return {"message": "PharmaMind API is running. Go to /docs for documentation."}
 
+@app.get("/drugs/{drug_name}")
+async def resolve_drug(drug_name: str):
+    molecule = resolve(drug_name)
+    return {
+        "query": drug_name,
+        "molecule_id": molecule.molecule_id,
+        "name": molecule.name,
+        "synonyms": list(molecule.synonyms),
+    }
+
+def _require_admin(token: Optional[str]):
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if token is None or not secrets.compare_digest(token, ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+@app.post("/admin/drug-index/refresh")
+def refresh_drug_names(x_admin_token: Optional[str] = Header(None)):
+    _require_admin(x_admin_token)
+    # Reloads here at once; the other workers pick up the new generation
+    # within drug_index.GENERATION_CHECK_SECONDS.
+    generation = refresh_drug_index()
+    return {"status": "reloaded", "generation": generation, "names": len(get_drug_index())}
+
 @app.get("/report/{drug_name}")
-async def get_drug_report(drug_name: str):
+def get_drug_report(drug_name: str, request: Request, refresh: bool = False):
     print(f"Received request for: {drug_name}")
-    
-    master_chain = get_master_chain()
-    
-    result = master_chain.invoke({"drug_name": drug_name})
-    
-    if isinstance(result, FinalReport):
-        print(f"Successfully generated report for: {drug_name}") 
-        return result.model_dump()
+
+    molecule = resolve(drug_name)
+    # Feeds the cache warmer's notion of which drugs are hot. 304
+    # revalidations count too: polling dashboards are the hottest clients.
+    get_access_log().record(molecule.molecule_id, molecule.name)
+
+    try:
+        stored, from_store = get_report(drug_name, refresh=refresh)
+    except TypeError as e:
+        return {"error": "Unexpected output type", "result": str(e)}
+
+    if from_store:
+        print(f"Serving stored report v{stored.version} for: {drug_name}")
     else:
-        return {"error": "Unexpected output type", "result": str(result)}
+        print(f"Successfully generated report for: {drug_name}")
+
+    headers = _cache_headers(stored)
+    if _is_not_modified(request, stored):
+        return Response(status_code=304, headers=headers)
+
+    # The stored payload is already serialized JSON, so it is sent as-is.
+    return Response(content=stored.payload, media_type="application/json", headers=headers)
+
+@app.get("/analytics/summary")
+def get_analytics_summary():
+    return get_analytics_store().summary()
+
+@app.get("/analytics/indications")
+def get_top_indications(limit: int = Query(20, ge=1, le=500)):
+    return get_analytics_store().top_indications(limit)
+
+@app.get("/analytics/trials/{dimension}")
+def get_trial_breakdown(dimension: str, limit: int = Query(20, ge=1, le=500)):
+    if dimension not in ("condition", "phase", "status"):
+        raise HTTPException(status_code=404, detail="Dimension must be one of: condition, phase, status")
+    return get_analytics_store().facts(dimension, limit)
+
+@app.get("/analytics/research/{dimension}")
+def get_research_breakdown(dimension: str, limit: int = Query(20, ge=1, le=500)):
+    if dimension not in ("topic", "paper_year"):
+        raise HTTPException(status_code=404, detail="Dimension must be one of: topic, paper_year")
+    return get_analytics_store().facts(dimension, limit)
+
+@app.get("/analytics/leaderboard")
+def get_leaderboard(limit: int = Query(20, ge=1, le=500), by: str = "drug"):
+    if by not in ("drug", "indication"):
+        raise HTTPException(status_code=404, detail="Leaderboard must be one of: drug, indication")
+    store = get_analytics_store()
+    if by == "indication":
+        return store.indication_leaderboard(limit)
+    return store.leaderboard(limit)
+
+@app.get("/stats/access")
+def get_access_stats(limit: int = Query(50, ge=1, le=500)):
+    return get_access_log().top(limit)
+
+@app.get("/artifacts/{content_hash}/{filename}")
+def get_artifact(content_hash: str, filename: str):
+    path = artifact_path(content_hash, filename)
+    if path is None:
+        return ORJSONResponse({"error": "Unknown artifact"}, status_code=404)
+
+    if os.path.exists(path):
+        # Artifacts are content-addressed, so they never change once written.
+        return FileResponse(path, headers={"Cache-Control": "public, max-age=31536000, immutable"})
+
+    if is_rendering(content_hash):
+        return ORJSONResponse({"status": "rendering"}, status_code=202, headers={"Retry-After": "5"})
+
+    return ORJSONResponse({"error": "Artifact not found"}, status_code=404)
 
 if __name__ == "__main__":
     print("Starting PharmaMind API server on http://127.0.0.1:8000")
     print("Go to http://127.0.0.1:8000/docs for the interactive API documentation.")
-    
+
+    # Workers share rate limits, caches and in-flight builds through
+    # src.coordination, so running several of them is safe. Reload mode
+    # only supports a single worker.
+    workers = int(os.getenv("PHARMAMIND_WORKERS", "1"))
+
     uvicorn.run(
         "api:app",
         host="127.0.0.1",
         port=8000,
-        reload=True
+        reload=workers == 1,
+        workers=workers
     )
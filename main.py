@@ -1,9 +1,8 @@
 import json
-from src.orchestration.master_agent import get_master_chain
-from src.schemas.final_report_schema import FinalReport
+from src.orchestration.report_service import get_report
 import os
 
-def run_pharmamind_pipeline(drug_name: str):
+def run_pharmamind_pipeline(drug_name: str, refresh: bool = False):
     print(f"INITIATING PHARMAMIND PIPELINE FOR: {drug_name}")
     
     if not os.getenv("OPENROUTER_API_KEY"):
@@ -14,28 +13,28 @@ def run_pharmamind_pipeline(drug_name: str):
         print("="*50)
         return
 
-    master_chain = get_master_chain()
-    
     try:
-        result = master_chain.invoke({"drug_name": drug_name})
+        stored, from_store = get_report(drug_name, refresh=refresh)
         
-        if isinstance(result, FinalReport):
-            print(f"PIPELINE COMPLETED: {drug_name}")
-            
-            final_json = result.model_dump_json(indent=2)
-            
-            output_filename = "example_output.json"
-            with open(output_filename, "w") as f:
-                f.write(final_json)
-            
-            print(f"\nFinal report saved to {output_filename}")
-            print("\n--- SAMPLE OF FINAL REPORT ---")
-            print(final_json)
-            print("--- END OF REPORT ---")
-            
+        if from_store:
+            print(f"USING STORED REPORT v{stored.version} FOR: {drug_name} (built {stored.created_at.isoformat()})")
         else:
-            print(f"PIPELINE ERROR: Unexpected output type")
-            print(result)
+            print(f"PIPELINE COMPLETED: {drug_name}")
+        
+        final_json = json.dumps(json.loads(stored.payload), indent=2)
+        
+        output_filename = "example_output.json"
+        with open(output_filename, "w") as f:
+            f.write(final_json)
+        
+        print(f"\nFinal report saved to {output_filename}")
+        print("\n--- SAMPLE OF FINAL REPORT ---")
+        print(final_json)
+        print("--- END OF REPORT ---")
+
+    except TypeError as e:
+        print(f"PIPELINE ERROR: Unexpected output type")
+        print(e)
 
     except Exception as e:
         print(f"PIPELINE FAILED")
@@ -2,6 +2,7 @@ from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.runnables import RunnablePassthrough
 from src.core.llm_provider import llm
 from src.tools import api_tools
+from src.coordination.coordinator import get_coordinator
 from src.schemas.market_schema import MarketAnalysis
 import json
 
@@ -29,6 +30,7 @@ def get_market_chain():
             market_data=lambda x: api_tools.get_market_data(x["indication"])
         )
         | prompt
+        | get_coordinator().throttle("llm")
         | llm.with_structured_output(MarketAnalysis)
     )
     
@@ -2,6 +2,7 @@ from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.runnables import RunnablePassthrough, RunnableParallel
 from src.core.llm_provider import llm
 from src.tools import api_tools
+from src.coordination.coordinator import get_coordinator
 from src.schemas.research_schema import ResearchReport
 import json
 
@@ -43,6 +44,7 @@ def get_research_chain():
     chain = (
         gather_data
         | prompt
+        | get_coordinator().throttle("llm")
         | llm.with_structured_output(ResearchReport)
     )
     
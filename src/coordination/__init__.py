@@ -0,0 +1,4 @@
+"""Coordination package for PharmaMind."""
+from .coordinator import Coordinator, get_coordinator, shared_cache
+
+__all__ = ['Coordinator', 'get_coordinator', 'shared_cache']
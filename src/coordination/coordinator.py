@@ -0,0 +1,279 @@
+"""
+Worker Coordinator
+Host-wide state shared by every uvicorn worker process, kept in a SQLite
+database in WAL mode next to the report store:
+
+- a token bucket per upstream (NCBI, ClinicalTrials.gov, the LLM), so all
+  workers together stay under each upstream's quota instead of each worker
+  enforcing it on its own;
+- a shared response cache for upstream API results and LLM outputs;
+- an in-flight registry, so a report being built by one worker is awaited
+  by the others instead of being built again;
+- generation counters, so a worker that reloads shared in-memory state
+  (e.g. the drug name index) can tell every other worker to reload too.
+"""
+import os
+import json
+import socket
+import threading
+import time
+from functools import wraps
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from src.storage.report_store import DATA_DIR
+from src.storage.database import SQLiteStore
+
+DB_PATH = os.path.join(DATA_DIR, "coordination.db")
+
+NCBI_API_KEY = os.getenv("NCBI_API_KEY")
+
+# upstream -> (tokens per second, bucket capacity)
+UPSTREAM_LIMITS = {
+    # NCBI allows 3 requests/second without an API key and 10 with one.
+    "ncbi": (10.0 if NCBI_API_KEY else 3.0, 3.0),
+    "clinicaltrials": (float(os.getenv("PHARMAMIND_CLINICALTRIALS_RPS", "5")), 5.0),
+    "llm": (float(os.getenv("PHARMAMIND_LLM_RPM", "10")) / 60.0, 2.0),
+}
+DEFAULT_LIMIT = (1.0, 1.0)
+
+# Claims whose owning process is gone are taken over immediately; this
+# timeout only covers owners that are alive but stuck.
+INFLIGHT_STALE_SECONDS = int(os.getenv("PHARMAMIND_INFLIGHT_STALE_SECONDS", "900"))
+INFLIGHT_POLL_SECONDS = 1.0
+
+
+def owner_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}"
+
+
+def _owner_alive(owner: str) -> bool:
+    """False if the owner is a process on this host that no longer exists."""
+    host, pid, _ = owner.rsplit(":", 2)
+    if host != socket.gethostname():
+        return True
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # Exists, but belongs to another user.
+        return True
+    return True
+
+
+def _claim_live(row) -> bool:
+    if row is None:
+        return False
+    owner, started_at = row
+    return time.time() - started_at < INFLIGHT_STALE_SECONDS and _owner_alive(owner)
+
+
+class Coordinator(SQLiteStore):
+    """Cross-process rate limiting, caching and request deduplication."""
+
+    def __init__(self, db_path: str = DB_PATH):
+        super().__init__(db_path)
+
+    def _init_schema(self):
+        with self._transaction() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS buckets (
+                    upstream   TEXT PRIMARY KEY,
+                    tokens     REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS cache (
+                    namespace  TEXT NOT NULL,
+                    key        TEXT NOT NULL,
+                    value      TEXT NOT NULL,
+                    expires_at REAL NOT NULL,
+                    PRIMARY KEY (namespace, key)
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS inflight (
+                    key        TEXT PRIMARY KEY,
+                    owner      TEXT NOT NULL,
+                    started_at REAL NOT NULL
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS generations (
+                    name       TEXT PRIMARY KEY,
+                    generation INTEGER NOT NULL,
+                    data       TEXT NOT NULL
+                )
+            """)
+
+    # --- Rate limiting ---
+
+    def acquire(self, upstream: str, tokens: float = 1.0):
+        """Blocks until `tokens` are available in the upstream's shared bucket."""
+        rate, capacity = UPSTREAM_LIMITS.get(upstream, DEFAULT_LIMIT)
+        while True:
+            with self._transaction() as conn:
+                now = time.time()
+                row = conn.execute(
+                    "SELECT tokens, updated_at FROM buckets WHERE upstream = ?",
+                    (upstream,),
+                ).fetchone()
+                available = capacity if row is None else min(capacity, row[0] + (now - row[1]) * rate)
+
+                if available >= tokens:
+                    available -= tokens
+                    wait = 0.0
+                else:
+                    wait = (tokens - available) / rate
+
+                conn.execute(
+                    "INSERT OR REPLACE INTO buckets VALUES (?, ?, ?)",
+                    (upstream, available, now),
+                )
+            if wait == 0.0:
+                return
+            # Sleep outside the transaction so other workers can refill/take.
+            time.sleep(wait)
+
+    def throttle(self, upstream: str) -> Callable[[Any], Any]:
+        """Pass-through step for LangChain pipelines that waits for an upstream token."""
+        def _throttle(x):
+            self.acquire(upstream)
+            return x
+        return _throttle
+
+    # --- Shared cache ---
+
+    def cache_get(self, namespace: str, key: str) -> Optional[Any]:
+        row = self._connect().execute(
+            "SELECT value FROM cache WHERE namespace = ? AND key = ? AND expires_at > ?",
+            (namespace, key, time.time()),
+        ).fetchone()
+        return json.loads(row[0]) if row is not None else None
+
+    def cache_set(self, namespace: str, key: str, value: Any, ttl_seconds: float):
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO cache VALUES (?, ?, ?, ?)",
+                (namespace, key, json.dumps(value), time.time() + ttl_seconds),
+            )
+            conn.execute("DELETE FROM cache WHERE expires_at <= ?", (time.time(),))
+
+    def spend(self, namespace: str, key: str, deltas: Dict[str, float],
+              limits: Dict[str, float], ttl_seconds: float) -> bool:
+        """
+        Adds `deltas` to the counters cached under (namespace, key) if every
+        counter stays within its limit. The check and the increment happen in
+        one transaction, so concurrent spenders cannot overshoot. Returns
+        whether the spend was recorded.
+        """
+        with self._transaction() as conn:
+            now = time.time()
+            row = conn.execute(
+                "SELECT value FROM cache WHERE namespace = ? AND key = ? AND expires_at > ?",
+                (namespace, key, now),
+            ).fetchone()
+            spent = json.loads(row[0]) if row is not None else {}
+            updated = {name: spent.get(name, 0) + delta for name, delta in deltas.items()}
+            if any(updated[name] > limits[name] for name in updated if name in limits):
+                return False
+            conn.execute(
+                "INSERT OR REPLACE INTO cache VALUES (?, ?, ?, ?)",
+                (namespace, key, json.dumps({**spent, **updated}), now + ttl_seconds),
+            )
+            return True
+
+    # --- In-flight registry ---
+
+    def claim(self, key: str, owner: Optional[str] = None) -> bool:
+        """Registers this worker as the builder of `key`. False if another live worker holds it."""
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT owner, started_at FROM inflight WHERE key = ?", (key,)
+            ).fetchone()
+            if _claim_live(row):
+                return False
+            conn.execute(
+                "INSERT OR REPLACE INTO inflight VALUES (?, ?, ?)",
+                (key, owner or owner_id(), time.time()),
+            )
+            return True
+
+    def release(self, key: str, owner: Optional[str] = None):
+        with self._transaction() as conn:
+            conn.execute(
+                "DELETE FROM inflight WHERE key = ? AND owner = ?",
+                (key, owner or owner_id()),
+            )
+
+    def is_claimed(self, key: str) -> bool:
+        row = self._connect().execute(
+            "SELECT owner, started_at FROM inflight WHERE key = ?", (key,)
+        ).fetchone()
+        return _claim_live(row)
+
+    def wait_for(self, key: str):
+        """Blocks until no live worker holds `key`."""
+        while self.is_claimed(key):
+            time.sleep(INFLIGHT_POLL_SECONDS)
+
+    # --- Generations ---
+
+    def generation(self, name: str) -> Tuple[int, Any]:
+        """Current (generation, data) for name; (0, None) if it was never bumped."""
+        row = self._connect().execute(
+            "SELECT generation, data FROM generations WHERE name = ?", (name,)
+        ).fetchone()
+        return (row[0], json.loads(row[1])) if row is not None else (0, None)
+
+    def bump_generation(self, name: str, data: Any = None) -> int:
+        """Starts a new generation of name carrying data. Returns its number."""
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT generation FROM generations WHERE name = ?", (name,)
+            ).fetchone()
+            generation = (row[0] if row is not None else 0) + 1
+            conn.execute(
+                "INSERT OR REPLACE INTO generations VALUES (?, ?, ?)",
+                (name, generation, json.dumps(data)),
+            )
+            return generation
+
+
+_coordinator = None
+
+
+def get_coordinator() -> Coordinator:
+    """Returns the process-wide Coordinator instance."""
+    global _coordinator
+    if _coordinator is None:
+        _coordinator = Coordinator()
+    return _coordinator
+
+
+def shared_cache(namespace: str, ttl_seconds: float, key_func: Optional[Callable[[Any], str]] = None):
+    """
+    Caches a function's JSON-serializable result in the shared cache, keyed by
+    its arguments. key_func, if given, maps the first argument to its cache
+    key so equivalent inputs share an entry. Empty results are not cached,
+    since the API tools return [] on upstream errors.
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if key_func is not None and args:
+                args_key = (key_func(args[0]),) + args[1:]
+            else:
+                args_key = args
+            key = json.dumps([args_key, kwargs], sort_keys=True, default=str)
+            cached = get_coordinator().cache_get(namespace, key)
+            if cached is not None:
+                print(f"[Cache] {namespace}: hit for {args[0] if args else key}")
+                return cached
+            result = func(*args, **kwargs)
+            if result:
+                get_coordinator().cache_set(namespace, key, result, ttl_seconds)
+            return result
+        return wrapper
+    return decorator
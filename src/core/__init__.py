@@ -1,5 +1,5 @@
 """Core package for PharmaMind."""
-from .llm_provider import llm
+from .llm_provider import llm, MODEL_NAME
 
-__all__ = ['llm']
+__all__ = ['llm', 'MODEL_NAME']
 
@@ -16,6 +16,8 @@ GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
 if not GOOGLE_API_KEY:
     raise ValueError("GOOGLE_API_KEY not found in environment variables. Please set it in your .env file.")
 
+MODEL_NAME = "gemini-2.5-flash"
+
 # --- Centralized LLM Instance ---
 
 def get_llm():
@@ -31,7 +33,7 @@ def get_llm():
     # Removed the "models/" prefix. The library will now correctly
     # select the right API version (like v1) for this model.
     llm = ChatGoogleGenerativeAI(
-        model="gemini-2.5-flash",
+        model=MODEL_NAME,
         google_api_key=GOOGLE_API_KEY,
         temperature=0,      # Set to 0 for deterministic, factual outputs
         convert_system_message_to_human=True # Helps with compatibility
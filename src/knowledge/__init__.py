@@ -0,0 +1,4 @@
+"""Knowledge package for PharmaMind."""
+from .drug_index import Molecule, get_drug_index, resolve, canonical_id, refresh
+
+__all__ = ['Molecule', 'get_drug_index', 'resolve', 'canonical_id', 'refresh']
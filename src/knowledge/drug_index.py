@@ -0,0 +1,226 @@
+"""
+Drug Name Index
+In-memory index of drug names, salts, brand names and synonyms, used to
+resolve whatever the user typed ("Glucophage", "metformin hydrochloride",
+"METFORMIN") to one canonical molecule before any work is done. Reports,
+caches and in-flight builds are all keyed by the canonical molecule ID, so
+every spelling of a drug shares one computation.
+
+The bundled table lives in data/drug_synonyms.csv. A larger dump can be
+loaded at startup through PHARMAMIND_DRUG_DUMP or at runtime via refresh()
+(POST /admin/drug-index/refresh in the API). The index lives in process
+memory, so refresh() publishes a new index generation through the worker
+coordinator; every process checks for it at most GENERATION_CHECK_SECONDS
+apart and reloads lazily, so all workers converge on the same canonical IDs.
+
+Both the bundled format (molecule_id, name, synonyms) and the DrugBank
+vocabulary export (DrugBank ID, Common name, Synonyms) are accepted;
+synonyms are separated by "|".
+
+Canonical IDs must stay stable across loads, since stored reports and
+caches are keyed by them: a dump entry that shares names with exactly one
+already indexed molecule is merged into it and keeps its ID, an entry whose
+names span several molecules is skipped rather than reassigning any of
+them, and new molecules are keyed by their normalized name, never by an
+external ID.
+External IDs such as DrugBank accessions still resolve as lookup names.
+"""
+import os
+import re
+import csv
+import threading
+import time
+import unicodedata
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+BUNDLED_TABLE = os.path.join(os.path.dirname(__file__), "data", "drug_synonyms.csv")
+DRUG_DUMP_PATH = os.getenv("PHARMAMIND_DRUG_DUMP")
+
+# Synonyms shorter than this (e.g. "ASA", "HCQ") resolve fine but are too
+# ambiguous to use as free-text search terms.
+MIN_QUERY_TERM_LENGTH = 4
+MAX_QUERY_TERMS = 8
+
+# How often a process checks whether another one published a new index
+# generation through refresh().
+GENERATION_CHECK_SECONDS = 5.0
+
+# Counter-ions and hydrate forms stripped when a salt name is not listed
+# explicitly, so "losartan potassium" still resolves to losartan. Only
+# applied when the stripped base is itself indexed; otherwise distinct
+# products such as magnesium sulfate and magnesium citrate would merge.
+SALT_SUFFIXES = (
+    "hydrochloride", "hcl", "dihydrochloride", "hydrobromide", "sodium", "potassium",
+    "calcium", "magnesium", "sulfate", "sulphate", "phosphate", "citrate", "maleate",
+    "mesylate", "besylate", "tartrate", "fumarate", "succinate", "acetate", "hyclate",
+    "monohydrate", "dihydrate", "anhydrous",
+)
+
+
+@dataclass(frozen=True)
+class Molecule:
+    molecule_id: str
+    name: str
+    synonyms: Tuple[str, ...] = ()
+
+    @property
+    def query_terms(self) -> List[str]:
+        """The name plus the most useful synonyms, for widening literature/trial searches."""
+        terms = [self.name]
+        for synonym in self.synonyms:
+            if len(synonym) >= MIN_QUERY_TERM_LENGTH and normalize(synonym) != normalize(self.name):
+                terms.append(synonym)
+        return terms[:MAX_QUERY_TERMS]
+
+
+def normalize(name: str) -> str:
+    """Case-, whitespace- and symbol-insensitive form of a drug name."""
+    name = unicodedata.normalize("NFKC", name).lower()
+    name = re.sub(r"[®™©]", "", name)
+    name = re.sub(r"[^\w\s\-/]", " ", name)
+    return " ".join(name.split())
+
+
+def _strip_salt(name: str) -> str:
+    words = name.split()
+    while len(words) > 1 and words[-1] in SALT_SUFFIXES:
+        words.pop()
+    return " ".join(words)
+
+
+def _read_table(path: str) -> List[Tuple[Molecule, Tuple[str, ...]]]:
+    """(molecule, extra lookup names) per row."""
+    molecules = []
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            name = (row.get("name") or row.get("Common name") or "").strip()
+            if not name:
+                continue
+            synonyms = tuple(s.strip() for s in (row.get("synonyms") or row.get("Synonyms") or "").split("|") if s.strip())
+            external_id = (row.get("DrugBank ID") or "").strip()
+            molecule_id = (row.get("molecule_id") or "").strip() or normalize(name)
+            extra = (external_id,) if external_id else ()
+            molecules.append((Molecule(molecule_id=molecule_id, name=name, synonyms=synonyms), extra))
+    return molecules
+
+
+class DrugIndex:
+    """Maps normalized names and synonyms to Molecules."""
+
+    def __init__(self):
+        self._by_name: Dict[str, Molecule] = {}
+
+    def load(self, *paths: str):
+        """
+        Rebuilds the index from the given tables. Entries sharing names with
+        exactly one indexed molecule are merged into it, keeping its ID.
+        Entries whose names belong to several molecules are skipped, so a
+        name is never moved from one molecule to another.
+        """
+        by_name = {}
+        keys_by_id: Dict[str, set] = {}
+        skipped = []
+        for path in paths:
+            for molecule, extra in _read_table(path):
+                keys = {normalize(n) for n in (molecule.molecule_id, molecule.name) + molecule.synonyms + extra}
+                touched = {by_name[k].molecule_id for k in keys if k in by_name}
+                if len(touched) > 1:
+                    skipped.append((molecule.name, sorted(touched)))
+                    continue
+                if touched:
+                    # Every key of a molecule maps to the same object, so any hit will do.
+                    existing = next(by_name[k] for k in keys if k in by_name)
+                    known = {normalize(n) for n in (existing.name,) + existing.synonyms}
+                    added = tuple(n for n in (molecule.name,) + molecule.synonyms if normalize(n) not in known)
+                    molecule = Molecule(existing.molecule_id, existing.name, existing.synonyms + added)
+                    keys |= keys_by_id[existing.molecule_id]
+                keys_by_id[molecule.molecule_id] = keys
+                for k in keys:
+                    by_name[k] = molecule
+        for name, molecule_ids in skipped:
+            print(f"[Drug Index] Skipped '{name}': its names belong to several molecules ({', '.join(molecule_ids)})")
+        # Swapped in one assignment, so readers see either the old or the
+        # new mapping and never need a lock.
+        self._by_name = by_name
+        print(f"[Drug Index] Loaded {len(by_name)} names for {len(set(by_name.values()))} molecules")
+
+    def __len__(self) -> int:
+        return len(self._by_name)
+
+    def lookup(self, name: str) -> Optional[Molecule]:
+        """Indexed Molecule for name, trying its salt-stripped base second."""
+        key = normalize(name)
+        by_name = self._by_name
+        return by_name.get(key) or by_name.get(_strip_salt(key))
+
+    def resolve(self, name: str) -> Molecule:
+        """
+        Returns the indexed Molecule for name. Unknown drugs resolve to a
+        Molecule keyed and named by their full normalized name, so spelling
+        variants collapse to one key and the pipeline always sees the same
+        name whichever variant was requested first.
+        """
+        molecule = self.lookup(name)
+        if molecule is not None:
+            return molecule
+        key = normalize(name)
+        return Molecule(molecule_id=key, name=key)
+
+
+_index = None
+_index_generation = None
+_checked_at = 0.0
+_index_lock = threading.Lock()
+
+
+def _coordinator():
+    # Imported lazily: the coordinator imports the report store, which
+    # imports this module.
+    from src.coordination.coordinator import get_coordinator
+    return get_coordinator()
+
+
+def _tables(dump_path: Optional[str] = None) -> List[str]:
+    dump_path = dump_path or DRUG_DUMP_PATH
+    return [BUNDLED_TABLE, dump_path] if dump_path else [BUNDLED_TABLE]
+
+
+def get_drug_index() -> DrugIndex:
+    """
+    Returns the process-wide DrugIndex, loading it on first use and
+    reloading it once another process has published a new generation.
+    """
+    global _index, _index_generation, _checked_at
+    if _index is not None and time.monotonic() - _checked_at < GENERATION_CHECK_SECONDS:
+        return _index
+    with _index_lock:
+        if _index is None or time.monotonic() - _checked_at >= GENERATION_CHECK_SECONDS:
+            generation, dump_path = _coordinator().generation("drug_index")
+            if _index is None or generation != _index_generation:
+                index = DrugIndex()
+                index.load(*_tables(dump_path))
+                _index, _index_generation = index, generation
+            _checked_at = time.monotonic()
+    return _index
+
+
+def refresh(dump_path: Optional[str] = None) -> int:
+    """
+    Reloads the index from the bundled table plus a dump (PHARMAMIND_DRUG_DUMP
+    unless dump_path is given) in every process: this one immediately, the
+    others on their next generation check. Returns the new generation.
+    """
+    global _checked_at
+    generation = _coordinator().bump_generation("drug_index", dump_path)
+    _checked_at = 0.0
+    get_drug_index()
+    return generation
+
+
+def resolve(name: str) -> Molecule:
+    return get_drug_index().resolve(name)
+
+
+def canonical_id(name: str) -> str:
+    return resolve(name).molecule_id
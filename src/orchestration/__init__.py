@@ -1,5 +1,5 @@
 """Orchestration package for PharmaMind."""
 from .master_agent import get_master_chain
+from .report_service import get_report, build_report, backfill_analytics
 
-__all__ = ['get_master_chain']
-
+__all__ = ['get_master_chain', 'get_report', 'build_report', 'backfill_analytics']
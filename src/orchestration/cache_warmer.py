@@ -0,0 +1,220 @@
+"""
+Cache Warmer
+Refreshes reports for watched and frequently requested drugs before they
+expire, so user-facing requests for them are served from the report store
+instead of paying the full pipeline latency.
+
+Each run builds a plan: every watchlist drug plus the hottest drugs from the
+API's access log, keeping only those whose stored report is missing or will
+expire before the next warming opportunity. Candidates are ranked by request
+frequency and staleness and refreshed until the daily upstream/LLM budget is
+spent. Refreshes run only inside the configured off-peak window.
+"""
+import os
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Iterable, List, Optional, Tuple
+
+from src.orchestration.master_agent import get_pipeline_config_hash
+from src.orchestration.report_service import get_report
+from src.storage.report_store import get_report_store, REPORT_TTL_SECONDS
+from src.storage.access_log import get_access_log
+from src.coordination.coordinator import get_coordinator
+from src.knowledge.drug_index import resolve
+
+WATCHLIST_PATH = os.getenv("PHARMAMIND_WATCHLIST", "watchlist.txt")
+# Local time, "HH:MM-HH:MM"; may wrap past midnight. Empty means always.
+WARM_WINDOW = os.getenv("PHARMAMIND_WARM_WINDOW", "01:00-06:00")
+WARM_INTERVAL_SECONDS = int(os.getenv("PHARMAMIND_WARM_INTERVAL_MINUTES", "15")) * 60
+DAILY_LLM_BUDGET = int(os.getenv("PHARMAMIND_WARM_LLM_BUDGET", "120"))
+DAILY_UPSTREAM_BUDGET = int(os.getenv("PHARMAMIND_WARM_UPSTREAM_BUDGET", "300"))
+HOT_DRUGS_LIMIT = 50
+MIN_HOT_SCORE = 1.0
+
+# Worst-case cost of one report build: the research call plus up to five
+# market analyses, and two PubMed calls plus one ClinicalTrials.gov call.
+REPORT_LLM_CALLS = 6
+REPORT_UPSTREAM_CALLS = 3
+
+# Watched drugs rank as if they had this many recent requests.
+WATCHLIST_WEIGHT = 5.0
+# Staleness used for drugs that have no stored report at all.
+MISSING_STALENESS = 1.5
+
+
+@dataclass
+class WarmCandidate:
+    molecule_id: str
+    drug_name: str
+    frequency: float
+    watched: bool
+    staleness: float
+
+    @property
+    def priority(self) -> float:
+        weight = self.frequency + (WATCHLIST_WEIGHT if self.watched else 0.0)
+        return weight * self.staleness
+
+
+def load_watchlist(path: str = WATCHLIST_PATH) -> List[str]:
+    """One drug per line; blank lines and # comments are ignored."""
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        lines = [line.split("#", 1)[0].strip() for line in f]
+    return [line for line in lines if line]
+
+
+def _parse_window(window: str) -> Optional[Tuple[int, int]]:
+    """'01:00-06:00' -> (60, 360) in minutes after midnight, or None for always."""
+    if not window:
+        return None
+    start, end = window.split("-")
+    to_minutes = lambda hhmm: int(hhmm.split(":")[0]) * 60 + int(hhmm.split(":")[1])
+    return to_minutes(start), to_minutes(end)
+
+
+def in_window(now: datetime, window: str = WARM_WINDOW) -> bool:
+    parsed = _parse_window(window)
+    if parsed is None:
+        return True
+    start, end = parsed
+    minute = now.hour * 60 + now.minute
+    if start <= end:
+        return start <= minute < end
+    return minute >= start or minute < end
+
+
+def seconds_until_next_run(now: datetime, window: str = WARM_WINDOW) -> float:
+    """
+    How long a report refreshed now must stay fresh: until the next window
+    opens after the current one, or one interval when there is no window.
+    """
+    parsed = _parse_window(window)
+    if parsed is None:
+        return WARM_INTERVAL_SECONDS
+    start_minute = parsed[0]
+    next_start = now.replace(hour=start_minute // 60, minute=start_minute % 60, second=0, microsecond=0)
+    if next_start <= now:
+        next_start += timedelta(days=1)
+    return (next_start - now).total_seconds()
+
+
+class WarmBudget:
+    """Daily upstream/LLM spend, shared by every warmer process on the host."""
+
+    def __init__(self, llm_budget: int = DAILY_LLM_BUDGET, upstream_budget: int = DAILY_UPSTREAM_BUDGET):
+        self.llm_budget = llm_budget
+        self.upstream_budget = upstream_budget
+
+    @property
+    def _key(self) -> str:
+        return datetime.now().strftime("%Y-%m-%d")
+
+    def _spent(self) -> dict:
+        return get_coordinator().cache_get("warm_budget", self._key) or {"llm": 0, "upstream": 0}
+
+    def can_afford(self, planned: int = 0) -> bool:
+        """
+        Whether one more build fits on top of `planned` builds not yet
+        charged. Advisory, for dry runs; real runs must use try_charge().
+        """
+        spent = self._spent()
+        builds = planned + 1
+        return (spent["llm"] + builds * REPORT_LLM_CALLS <= self.llm_budget
+                and spent["upstream"] + builds * REPORT_UPSTREAM_CALLS <= self.upstream_budget)
+
+    def try_charge(self) -> bool:
+        """Reserves one report build's worth of budget, or returns False if it would overspend."""
+        return get_coordinator().spend(
+            "warm_budget", self._key,
+            {"llm": REPORT_LLM_CALLS, "upstream": REPORT_UPSTREAM_CALLS},
+            {"llm": self.llm_budget, "upstream": self.upstream_budget},
+            2 * 24 * 3600,
+        )
+
+    def remaining(self) -> dict:
+        spent = self._spent()
+        return {"llm": self.llm_budget - spent["llm"], "upstream": self.upstream_budget - spent["upstream"]}
+
+
+def plan(watchlist: Iterable[str], now: Optional[datetime] = None) -> List[WarmCandidate]:
+    """Drugs that need refreshing before the next run, highest priority first."""
+    now = now or datetime.now()
+    horizon = seconds_until_next_run(now)
+    store = get_report_store()
+    chash = get_pipeline_config_hash()
+
+    candidates = {}
+    for name in watchlist:
+        molecule = resolve(name)
+        candidates[molecule.molecule_id] = WarmCandidate(molecule.molecule_id, molecule.name, 0.0, True, 0.0)
+    for stats in get_access_log().top(HOT_DRUGS_LIMIT):
+        if stats["score"] < MIN_HOT_SCORE:
+            continue
+        candidate = candidates.get(stats["molecule_id"])
+        if candidate is None:
+            candidate = candidates[stats["molecule_id"]] = WarmCandidate(
+                stats["molecule_id"], resolve(stats["drug_name"]).name, 0.0, False, 0.0
+            )
+        candidate.frequency = stats["score"]
+
+    planned = []
+    for candidate in candidates.values():
+        stored = store.get(candidate.molecule_id, chash)
+        if stored is None:
+            candidate.staleness = MISSING_STALENESS
+        elif stored.age_seconds + horizon >= REPORT_TTL_SECONDS:
+            candidate.staleness = stored.age_seconds / REPORT_TTL_SECONDS
+        else:
+            continue
+        planned.append(candidate)
+
+    return sorted(planned, key=lambda c: c.priority, reverse=True)
+
+
+def run_once(watchlist: Iterable[str], budget: Optional[WarmBudget] = None, dry_run: bool = False) -> int:
+    """Refreshes planned drugs until the budget runs out. Returns how many were refreshed."""
+    budget = budget or WarmBudget()
+    candidates = plan(watchlist)
+    print(f"[Cache Warmer] {len(candidates)} drugs need refreshing; budget left: {budget.remaining()}")
+
+    refreshed = 0
+    planned = 0
+    for candidate in candidates:
+        # Other warmer processes draw on the same budget, so a real run
+        # reserves it atomically before refreshing.
+        affordable = budget.can_afford(planned) if dry_run else budget.try_charge()
+        if not affordable:
+            print("[Cache Warmer] Daily budget exhausted, stopping")
+            break
+
+        print(f"[Cache Warmer] Refreshing {candidate.drug_name} "
+              f"(priority {candidate.priority:.2f}, staleness {candidate.staleness:.2f}, "
+              f"{'watched' if candidate.watched else 'hot'})")
+        if dry_run:
+            planned += 1
+            continue
+
+        try:
+            get_report(candidate.drug_name, refresh=True)
+            refreshed += 1
+        except Exception as e:
+            print(f"[Cache Warmer] Failed to refresh {candidate.drug_name}: {e}")
+
+    return refreshed
+
+
+def run_forever(watchlist_path: str = WATCHLIST_PATH, budget: Optional[WarmBudget] = None):
+    """Runs a warming pass every interval while inside the off-peak window."""
+    print(f"[Cache Warmer] Started (window: {WARM_WINDOW or 'always'}, interval: {WARM_INTERVAL_SECONDS}s)")
+    while True:
+        try:
+            if in_window(datetime.now()):
+                run_once(load_watchlist(watchlist_path), budget)
+        except Exception as e:
+            # E.g. a locked database or a malformed PHARMAMIND_WARM_WINDOW;
+            # retried next interval rather than stopping the daemon.
+            print(f"[Cache Warmer] Warming pass failed: {e}")
+        time.sleep(WARM_INTERVAL_SECONDS)
@@ -1,50 +1,59 @@
 from datetime import datetime
+from functools import lru_cache
 from langchain_core.runnables import RunnablePassthrough
-from src.core.llm_provider import llm
-from src.agents.research_agent import get_research_chain
-from src.agents.market_agent import get_market_chain
-from src.schemas.final_report_schema import (
-    FinalReport, ReportSummary, ClinicalTrialsReport, ResearchPapersReport,
-    PatentsReport, MarketAnalysisReport, VisualizationData, ReportLinks,
-    TrialDetail, PaperDetail, PatentDetail, MarketIndicationAnalysis
-)
+from src.core.llm_provider import llm, MODEL_NAME
+from src.agents.research_agent import get_research_chain, PROMPT_TEMPLATE as RESEARCH_PROMPT
+from src.agents.market_agent import get_market_chain, PROMPT_TEMPLATE as MARKET_PROMPT
+from src.storage.report_store import config_hash, drug_key
+from src.coordination.coordinator import get_coordinator
+from src.rendering.charts import build_chart_series, patent_trend
+from src.rendering.renderer import content_hash, artifact_url
+from src.schemas.final_report_schema import FinalReport
 import json
 
+MARKET_CACHE_TTL_SECONDS = 7 * 24 * 3600
+
+@lru_cache(maxsize=None)
+def get_pipeline_config_hash() -> str:
+    """
+    Hash of everything that determines report content. Stored reports built
+    with a different model, prompt or schema are never served.
+    """
+    return config_hash(
+        MODEL_NAME,
+        RESEARCH_PROMPT,
+        MARKET_PROMPT,
+        json.dumps(FinalReport.model_json_schema(), sort_keys=True),
+    )
+
 def get_master_chain():
     research_chain = get_research_chain()
     market_chain = get_market_chain()
     
-    def _group_trials_by_disease(trials: list) -> dict:
-        grouped = {}
-        for trial in trials:
-            disease = trial.get("condition", "Unknown")
-            grouped[disease] = grouped.get(disease, 0) + 1
-        return grouped
-    
     def _convert_trials(trials: list) -> list:
-        return [TrialDetail(
-            title=t.get("title", ""),
-            phase=t.get("phase", ""),
-            status=t.get("status", ""),
-            year=t.get("year", 2024),
-            url=t.get("url", "")
-        ) for t in trials[:10]]
+        return [{
+            "title": t.get("title", ""),
+            "phase": t.get("phase", ""),
+            "status": t.get("status", ""),
+            "year": t.get("year", 2024),
+            "url": t.get("url", "")
+        } for t in trials[:10]]
     
     def _convert_publications(pubs: list) -> list:
-        return [PaperDetail(
-            title=p.get("title", ""),
-            year=p.get("year", 2024),
-            authors=p.get("authors", []),
-            url=p.get("url", "")
-        ) for p in pubs[:10]]
+        return [{
+            "title": p.get("title", ""),
+            "year": p.get("year", 2024),
+            "authors": p.get("authors", []),
+            "url": p.get("url", "")
+        } for p in pubs[:10]]
     
     def _convert_patents(patents: list) -> list:
-        return [PatentDetail(
-            title=p.get("title", ""),
-            year=p.get("year", 2024),
-            applicant=p.get("applicant", ""),
-            url=p.get("url", "")
-        ) for p in patents[:10]]
+        return [{
+            "title": p.get("title", ""),
+            "year": p.get("year", 2024),
+            "applicant": p.get("applicant", ""),
+            "url": p.get("url", "")
+        } for p in patents[:10]]
     
     def _calculate_potential_score(market: dict) -> float:
         market_size = market.get("estimated_market_size_usd", 0)
@@ -67,13 +76,13 @@ def get_master_chain():
         top_indications = []
         for market in markets:
             potential_score = _calculate_potential_score(market)
-            top_indications.append(MarketIndicationAnalysis(
-                disease=market.get("target_indication", ""),
-                market_size_usd_billion=market.get("estimated_market_size_usd", 0) / 1_000_000_000,
-                competition=", ".join(market.get("key_competitors", [])) or "Low",
-                potential_score=potential_score
-            ))
-        return sorted(top_indications, key=lambda x: x.potential_score, reverse=True)
+            top_indications.append({
+                "disease": market.get("target_indication", ""),
+                "market_size_usd_billion": market.get("estimated_market_size_usd", 0) / 1_000_000_000,
+                "competition": ", ".join(market.get("key_competitors", [])) or "Low",
+                "potential_score": potential_score
+            })
+        return sorted(top_indications, key=lambda x: x["potential_score"], reverse=True)
     
     def synthesize_report(data: dict) -> dict:
         drug_name = data["drug_name"]
@@ -84,46 +93,46 @@ def get_master_chain():
         key_trials = research.get("key_trials", [])
         key_publications = research.get("key_publications", [])
         key_patents = research.get("key_patents", [])
+        top_indications = _convert_market_analyses(markets)
+        charts = build_chart_series(key_trials, key_patents, top_indications)
         
-        final_report = FinalReport(
-            drug_name=drug_name,
-            summary=ReportSummary(
-                overall_insight=f"{drug_name} shows significant repurposing potential based on recent research and market analysis."
-            ),
-            clinical_trials=ClinicalTrialsReport(
-                total_trials=len(key_trials),
-                trials_by_disease=_group_trials_by_disease(key_trials),
-                key_trials=_convert_trials(key_trials),
-                summary=research.get("research_trends", "")
-            ),
-            research_papers=ResearchPapersReport(
-                total_papers=len(key_publications),
-                key_topics=potential_new_indications,
-                top_papers=_convert_publications(key_publications),
-                summary=research.get("research_trends", "")
-            ),
-            patents=PatentsReport(
-                total_patents=len(key_patents),
-                recent_patents=_convert_patents(key_patents),
-                patent_trend={},
-                summary="Patent activity suggests growing interest in new applications."
-            ),
-            market_analysis=MarketAnalysisReport(
-                top_indications=_convert_market_analyses(markets),
-                summary=_synthesize_market_summary(markets)
-            ),
-            visualization_data=VisualizationData(
-                charts={
-                    "trials_by_disease": _group_trials_by_disease(key_trials),
-                    "patent_trend": {},
-                    "market_potential": {}
-                }
-            ),
-            report_links=ReportLinks(
-                pdf_report=f"https://pharmamind.ai/reports/{drug_name.lower()}_report.pdf",
-                timestamp=datetime.now()
-            )
-        )
+        # The report is assembled as plain data and validated exactly once
+        # here: the fallback market entries and the chart series never went
+        # through an agent's structured-output schema.
+        final_report = FinalReport.model_validate({
+            "drug_name": drug_name,
+            "summary": {
+                "overall_insight": f"{drug_name} shows significant repurposing potential based on recent research and market analysis."
+            },
+            "clinical_trials": {
+                "total_trials": len(key_trials),
+                "trials_by_disease": charts["trials_by_disease"],
+                "key_trials": _convert_trials(key_trials),
+                "summary": research.get("research_trends", "")
+            },
+            "research_papers": {
+                "total_papers": len(key_publications),
+                "key_topics": potential_new_indications,
+                "top_papers": _convert_publications(key_publications),
+                "summary": research.get("research_trends", "")
+            },
+            "patents": {
+                "total_patents": len(key_patents),
+                "recent_patents": _convert_patents(key_patents),
+                "patent_trend": patent_trend(key_patents),
+                "summary": "Patent activity suggests growing interest in new applications."
+            },
+            "market_analysis": {
+                "top_indications": top_indications,
+                "summary": _synthesize_market_summary(markets)
+            },
+            "visualization_data": {"charts": charts},
+            "report_links": {"pdf_report": "", "timestamp": datetime.now()}
+        })
+        
+        # Artifacts are addressed by content (which excludes report_links),
+        # so the link can only be set once everything else is final.
+        final_report.report_links.pdf_report = artifact_url(content_hash(final_report))
         
         return final_report
     
@@ -132,7 +141,16 @@ def get_master_chain():
         drug_name = research_dict.get("drug_name", "")
         potential_indications = research_dict.get("potential_new_indications", [])[:5]
         market_results = []
+        coordinator = get_coordinator()
         for indication in potential_indications:
+            # Market analyses are shared across workers so the same LLM call
+            # is never paid for twice.
+            cache_key = json.dumps([drug_key(drug_name), indication.lower(), get_pipeline_config_hash()])
+            cached = coordinator.cache_get("market_analysis", cache_key)
+            if cached is not None:
+                print(f"[Master] Using cached market analysis for: {indication[:80]}")
+                market_results.append(cached)
+                continue
             try:
                 print(f"[Master] Analyzing market for: {indication[:80]}...")
                 market_result = market_chain.invoke({
@@ -140,9 +158,9 @@ def get_master_chain():
                     "indication": indication
                 })
                 if hasattr(market_result, 'model_dump'):
-                    market_results.append(market_result.model_dump())
-                else:
-                    market_results.append(market_result)
+                    market_result = market_result.model_dump()
+                market_results.append(market_result)
+                coordinator.cache_set("market_analysis", cache_key, market_result, MARKET_CACHE_TTL_SECONDS)
             except Exception as e:
                 error_msg = str(e)
                 if "Rate limit" in error_msg or "429" in error_msg:
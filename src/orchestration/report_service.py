@@ -0,0 +1,119 @@
+"""
+Report Service
+Single entry point for getting a drug report. Serves the stored report when
+it is fresh and only runs the master chain on a miss, a stale entry, or an
+explicit refresh.
+
+Builds are deduplicated across worker processes: if another worker is
+already building the same report, this worker waits for it and serves the
+result instead of running the pipeline again.
+
+Drug names are resolved to a canonical molecule first, so "Glucophage",
+"metformin hydrochloride" and "Metformin" all share one report.
+"""
+from typing import Tuple
+from src.orchestration.master_agent import get_master_chain, get_pipeline_config_hash
+from src.schemas.final_report_schema import FinalReport
+from src.storage.report_store import get_report_store, load_report, StoredReport
+from src.storage.analytics import get_analytics_store
+from src.coordination.coordinator import get_coordinator
+from src.rendering.renderer import submit_render, digest_from_payload, is_rendered, is_rendering, render_backed_off
+from src.knowledge.drug_index import resolve
+
+_master_chain = None
+
+
+def _get_chain():
+    global _master_chain
+    if _master_chain is None:
+        _master_chain = get_master_chain()
+    return _master_chain
+
+
+def build_report(drug_name: str) -> StoredReport:
+    """Runs the full pipeline for drug_name and stores the result."""
+    molecule = resolve(drug_name)
+    result = _get_chain().invoke({"drug_name": molecule.name})
+
+    if not isinstance(result, FinalReport):
+        raise TypeError(f"Unexpected output type from master chain: {type(result).__name__}")
+
+    # PDF and chart rendering happens in the background; the report already
+    # links to where the artifacts will appear.
+    submit_render(result)
+
+    stored = get_report_store().save_report(molecule.molecule_id, get_pipeline_config_hash(), result)
+    get_analytics_store().record_report(molecule.molecule_id, result)
+    return stored
+
+
+def _ensure_rendered(stored: StoredReport):
+    """
+    Re-submits rendering for a stored report whose artifacts are missing,
+    e.g. after a failed render or a cleared artifacts directory. Costs one
+    stat() when the artifacts exist, and two key lookups while a render is
+    running or backing off after a failure; the payload is only parsed when
+    a render is actually submitted.
+    """
+    digest = digest_from_payload(stored.payload)
+    if digest is None or is_rendered(digest):
+        return
+    if is_rendering(digest) or render_backed_off(digest):
+        return
+    submit_render(load_report(stored.payload), digest)
+
+
+def backfill_analytics():
+    """Feeds every stored report into the analytics store, e.g. after it was created."""
+    analytics = get_analytics_store()
+    count = 0
+    for stored in get_report_store().iter_latest(get_pipeline_config_hash()):
+        analytics.record_report(stored.drug_key, load_report(stored.payload))
+        count += 1
+    print(f"[Report Service] Backfilled analytics from {count} stored reports")
+
+
+def get_report(drug_name: str, refresh: bool = False) -> Tuple[StoredReport, bool]:
+    """
+    Returns (stored_report, from_store). from_store is True when the
+    report was served without running the pipeline.
+    """
+    store = get_report_store()
+    molecule = resolve(drug_name)
+    key = molecule.molecule_id
+    if molecule.name != drug_name:
+        print(f"[Report Service] Resolved '{drug_name}' to {molecule.name} ({key})")
+    chash = get_pipeline_config_hash()
+
+    def _fresh_stored():
+        stored = store.get(key, chash)
+        if stored is None or not stored.is_fresh():
+            return None
+        _ensure_rendered(stored)
+        return stored
+
+    if not refresh:
+        stored = _fresh_stored()
+        if stored is not None:
+            return stored, True
+
+    coordinator = get_coordinator()
+    inflight_key = f"report:{key}:{chash}"
+
+    while not coordinator.claim(inflight_key):
+        print(f"[Report Service] {molecule.name} is being built by another worker, waiting...")
+        coordinator.wait_for(inflight_key)
+        # A build that finished while we waited satisfies a refresh too.
+        stored = _fresh_stored()
+        if stored is not None:
+            return stored, True
+
+    try:
+        if not refresh:
+            # Another worker may have finished between the lookup and the claim.
+            stored = _fresh_stored()
+            if stored is not None:
+                return stored, True
+        return build_report(molecule.name), False
+    finally:
+        coordinator.release(inflight_key)
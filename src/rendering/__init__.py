@@ -0,0 +1,5 @@
+"""Rendering package for PharmaMind."""
+from .charts import build_chart_series
+from .renderer import submit_render, content_hash, artifact_url
+
+__all__ = ['build_chart_series', 'submit_render', 'content_hash', 'artifact_url']
@@ -0,0 +1,57 @@
+"""
+Chart Series
+Computes the series behind the dashboard charts and the rendered artifacts
+from the raw research and market data. Pure Python, cheap enough to run
+inline while synthesizing the report.
+"""
+from typing import Dict, List
+
+
+def _count_by(items: List[dict], field: str, default: str) -> Dict[str, int]:
+    counts = {}
+    for item in items:
+        value = item.get(field) or default
+        counts[value] = counts.get(value, 0) + 1
+    return counts
+
+
+def trials_by_disease(trials: List[dict]) -> Dict[str, int]:
+    return _count_by(trials, "condition", "Unknown")
+
+
+def trials_by_phase(trials: List[dict]) -> Dict[str, int]:
+    return _count_by(trials, "phase", "N/A")
+
+
+def trials_by_status(trials: List[dict]) -> Dict[str, int]:
+    return _count_by(trials, "status", "Unknown")
+
+
+def patent_trend(patents: List[dict]) -> Dict[int, int]:
+    """Patent count per year, oldest first. Patents without a year are skipped."""
+    counts = {}
+    for patent in patents:
+        year = patent.get("year")
+        if year:
+            counts[year] = counts.get(year, 0) + 1
+    return dict(sorted(counts.items()))
+
+
+def market_potential(indications: List[dict]) -> Dict[str, float]:
+    """Potential score per indication, from MarketIndicationAnalysis dicts."""
+    return {ind["disease"]: ind["potential_score"] for ind in indications}
+
+
+def build_chart_series(trials: List[dict], patents: List[dict], indications: List[dict]) -> Dict[str, dict]:
+    """
+    All chart series, keyed as VisualizationData.charts expects. Chart keys
+    are strings, so patent years are stringified here; PatentsReport keeps
+    the int-keyed patent_trend().
+    """
+    return {
+        "trials_by_disease": trials_by_disease(trials),
+        "trials_by_phase": trials_by_phase(trials),
+        "trials_by_status": trials_by_status(trials),
+        "patent_trend": {str(year): count for year, count in patent_trend(patents).items()},
+        "market_potential": market_potential(indications),
+    }
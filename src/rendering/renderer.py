@@ -0,0 +1,270 @@
+"""
+Artifact Renderer
+Renders the PDF report and chart PNGs for a FinalReport off the request
+path, in a process pool, so CPU-heavy rendering never blocks the API's
+event loop or request threads.
+
+Artifacts are keyed by a content hash of the report (excluding its links
+and timestamp), so an unchanged report is never rendered twice, whether it
+is rebuilt later or requested from another worker process.
+"""
+import os
+import re
+import shutil
+import tempfile
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+from src.storage.report_store import DATA_DIR, content_hash
+from src.coordination.coordinator import get_coordinator, owner_id
+
+ARTIFACTS_DIR = os.path.join(DATA_DIR, "artifacts")
+PUBLIC_BASE_URL = os.getenv("PHARMAMIND_PUBLIC_URL", "http://127.0.0.1:8000").rstrip("/")
+RENDER_WORKERS = int(os.getenv("PHARMAMIND_RENDER_WORKERS", "2"))
+# A failed render is retried after this delay, doubling per consecutive
+# failure up to the maximum; the failure count resets after a day.
+RENDER_RETRY_SECONDS = 60
+RENDER_MAX_RETRY_SECONDS = 3600
+RENDER_FAILURE_TTL_SECONDS = 24 * 3600
+
+PDF_FILENAME = "report.pdf"
+CHART_NAMES = ["trials_by_disease", "trials_by_phase", "trials_by_status", "patent_trend", "market_potential"]
+ARTIFACT_FILENAMES = {PDF_FILENAME} | {f"{name}.png" for name in CHART_NAMES}
+
+_HASH_RE = re.compile(r"^[0-9a-f]{32}$")
+_PAYLOAD_DIGEST_RE = re.compile(rb"/artifacts/([0-9a-f]{32})/")
+
+_executor = None
+
+
+def artifact_url(digest: str, filename: str = PDF_FILENAME) -> str:
+    return f"{PUBLIC_BASE_URL}/artifacts/{digest}/{filename}"
+
+
+def artifact_path(digest: str, filename: str) -> Optional[str]:
+    """Filesystem path for an artifact, or None if the name is not a valid artifact."""
+    if not _HASH_RE.match(digest) or filename not in ARTIFACT_FILENAMES:
+        return None
+    return os.path.join(ARTIFACTS_DIR, digest, filename)
+
+
+def digest_from_payload(payload: bytes) -> Optional[str]:
+    """Content hash from a serialized report's pdf_report link, without parsing it."""
+    match = _PAYLOAD_DIGEST_RE.search(payload)
+    return match.group(1).decode("ascii") if match else None
+
+
+def is_rendered(digest: str) -> bool:
+    # The artifact directory is moved into place only once it is complete.
+    return os.path.exists(os.path.join(ARTIFACTS_DIR, digest, PDF_FILENAME))
+
+
+def is_rendering(digest: str) -> bool:
+    return get_coordinator().is_claimed(f"render:{digest}")
+
+
+def render_backed_off(digest: str) -> bool:
+    """True while a recent render failure for digest is waiting out its retry delay."""
+    failure = get_coordinator().cache_get("render_failed", digest)
+    return failure is not None and time.time() < failure["retry_at"]
+
+
+def _record_failure(coordinator, digest: str):
+    failure = coordinator.cache_get("render_failed", digest) or {"attempts": 0}
+    attempts = failure["attempts"] + 1
+    delay = min(RENDER_RETRY_SECONDS * 2 ** (attempts - 1), RENDER_MAX_RETRY_SECONDS)
+    coordinator.cache_set(
+        "render_failed", digest,
+        {"attempts": attempts, "retry_at": time.time() + delay},
+        RENDER_FAILURE_TTL_SECONDS,
+    )
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        # Spawned rather than forked: the pool starts lazily inside a
+        # threaded uvicorn worker holding open SQLite connections, and
+        # forking a threaded process can deadlock the child.
+        _executor = ProcessPoolExecutor(
+            max_workers=RENDER_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _executor
+
+
+def submit_render(report, digest: Optional[str] = None) -> str:
+    """
+    Schedules rendering of the report's artifacts and returns immediately.
+    Returns the content hash under which the artifacts will appear.
+    """
+    digest = digest or content_hash(report)
+    if is_rendered(digest) or render_backed_off(digest):
+        return digest
+
+    coordinator = get_coordinator()
+    render_key = f"render:{digest}"
+    # The done callback runs on another thread, so the claim owner is fixed here.
+    owner = owner_id()
+    if not coordinator.claim(render_key, owner=owner):
+        return digest
+
+    print(f"[Renderer] Rendering artifacts for {report.drug_name} ({digest})")
+    future = _get_executor().submit(render_artifacts, digest, report.model_dump(mode="json"), ARTIFACTS_DIR)
+
+    def _on_done(f):
+        error = f.exception()
+        try:
+            if error is not None:
+                # Recorded before the claim is released, so no other worker
+                # can resubmit in between.
+                _record_failure(coordinator, digest)
+        finally:
+            coordinator.release(render_key, owner=owner)
+        if error is not None:
+            print(f"[Renderer] Rendering failed for {digest}: {error}")
+        else:
+            print(f"[Renderer] Artifacts ready for {digest}")
+
+    future.add_done_callback(_on_done)
+    return digest
+
+
+# --- Worker-process side ---
+# Everything below runs inside the process pool and only receives plain
+# dicts, so it must not touch the coordinator or any pydantic models.
+
+def _render_bar_chart(title: str, series: dict, path: str, horizontal: bool = False):
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    labels = [str(k) for k in series.keys()]
+    values = list(series.values())
+
+    fig, ax = plt.subplots(figsize=(8, 4.5), dpi=100)
+    if not values:
+        ax.text(0.5, 0.5, "No data available", ha="center", va="center")
+        ax.set_axis_off()
+    elif horizontal:
+        ax.barh(labels, values, color="#2b6cb0")
+        ax.invert_yaxis()
+    else:
+        ax.bar(labels, values, color="#2b6cb0")
+        plt.setp(ax.get_xticklabels(), rotation=30, ha="right")
+    ax.set_title(title)
+    fig.tight_layout()
+    fig.savefig(path, format="png")
+    plt.close(fig)
+
+
+def _render_pdf(report: dict, chart_paths: dict, path: str):
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.lib.units import cm
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, Image
+    from xml.sax.saxutils import escape
+
+    styles = getSampleStyleSheet()
+    story = []
+
+    # Paragraph parses its text as markup, so titles containing "&" or "<"
+    # from upstream data must be escaped.
+    def heading(text):
+        story.append(Spacer(1, 0.4 * cm))
+        story.append(Paragraph(escape(text), styles["Heading2"]))
+
+    def paragraph(text):
+        if text:
+            story.append(Paragraph(escape(text), styles["BodyText"]))
+
+    def table(rows):
+        t = Table(rows, repeatRows=1)
+        t.setStyle(TableStyle([
+            ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#2b6cb0")),
+            ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
+            ("FONTSIZE", (0, 0), (-1, -1), 8),
+            ("GRID", (0, 0), (-1, -1), 0.25, colors.grey),
+            ("VALIGN", (0, 0), (-1, -1), "TOP"),
+        ]))
+        story.append(t)
+
+    def chart(name):
+        if name in chart_paths:
+            story.append(Image(chart_paths[name], width=16 * cm, height=9 * cm))
+
+    cell = lambda text: Paragraph(escape(str(text)), styles["BodyText"])
+
+    story.append(Paragraph(escape(f"PharmaMind Report: {report['drug_name']}"), styles["Title"]))
+    paragraph(report["summary"]["overall_insight"])
+
+    trials = report["clinical_trials"]
+    heading(f"Clinical Trials ({trials['total_trials']})")
+    paragraph(trials["summary"])
+    if trials["key_trials"]:
+        table([["Title", "Phase", "Status", "Year"]] + [
+            [cell(t["title"]), t["phase"], t["status"], t["year"]] for t in trials["key_trials"]
+        ])
+    chart("trials_by_disease")
+    chart("trials_by_phase")
+    chart("trials_by_status")
+
+    papers = report["research_papers"]
+    heading(f"Research Papers ({papers['total_papers']})")
+    paragraph(papers["summary"])
+    if papers["top_papers"]:
+        table([["Title", "Year"]] + [[cell(p["title"]), p["year"]] for p in papers["top_papers"]])
+
+    patents = report["patents"]
+    heading(f"Patents ({patents['total_patents']})")
+    paragraph(patents["summary"])
+    if patents["recent_patents"]:
+        table([["Title", "Applicant", "Year"]] + [
+            [cell(p["title"]), cell(p["applicant"]), p["year"]] for p in patents["recent_patents"]
+        ])
+    chart("patent_trend")
+
+    market = report["market_analysis"]
+    heading("Market Analysis")
+    paragraph(market["summary"])
+    if market["top_indications"]:
+        table([["Indication", "Market (USD bn)", "Potential"]] + [
+            [cell(m["disease"]), f"{m['market_size_usd_billion']:.2f}", f"{m['potential_score']:.2f}"]
+            for m in market["top_indications"]
+        ])
+    chart("market_potential")
+
+    SimpleDocTemplate(path, pagesize=A4, title=f"PharmaMind Report: {report['drug_name']}").build(story)
+
+
+def render_artifacts(digest: str, report: dict, artifacts_dir: str):
+    """Renders all artifacts into a temp dir and moves them into place atomically."""
+    final_dir = os.path.join(artifacts_dir, digest)
+    os.makedirs(artifacts_dir, exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(prefix=f".{digest}-", dir=artifacts_dir)
+
+    try:
+        charts = report["visualization_data"]["charts"]
+        chart_paths = {}
+        for name in CHART_NAMES:
+            path = os.path.join(tmp_dir, f"{name}.png")
+            _render_bar_chart(
+                name.replace("_", " ").title(),
+                charts.get(name, {}),
+                path,
+                horizontal=name in ("trials_by_disease", "market_potential"),
+            )
+            chart_paths[name] = path
+
+        _render_pdf(report, chart_paths, os.path.join(tmp_dir, PDF_FILENAME))
+
+        if os.path.exists(final_dir):
+            shutil.rmtree(tmp_dir)
+        else:
+            os.rename(tmp_dir, final_dir)
+    except BaseException:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
@@ -0,0 +1,5 @@
+"""Storage package for PharmaMind."""
+from .report_store import ReportStore, StoredReport, get_report_store, drug_key
+from .analytics import AnalyticsStore, get_analytics_store
+
+__all__ = ['ReportStore', 'StoredReport', 'get_report_store', 'drug_key', 'AnalyticsStore', 'get_analytics_store']
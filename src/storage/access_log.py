@@ -0,0 +1,121 @@
+"""
+Access Log
+Per-drug request frequency, recorded by the API and read by the cache
+warmer to decide which reports are hot. Frequency is kept as an
+exponentially decayed hit count, so a drug that was popular last month
+but not since slowly drops out of the hot set.
+
+Every request counts, including 304 revalidations from polling dashboards,
+but repeat hits on a molecule are buffered in memory and written at most
+once per RECORD_INTERVAL_SECONDS, so polling stays cheap.
+"""
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List
+
+from src.storage.report_store import DB_PATH
+from src.storage.database import SQLiteStore
+
+HALF_LIFE_SECONDS = float(os.getenv("PHARMAMIND_ACCESS_HALF_LIFE_HOURS", "72")) * 3600
+RECORD_INTERVAL_SECONDS = 60
+
+
+def _decay(score: float, elapsed: float) -> float:
+    return score * 0.5 ** (elapsed / HALF_LIFE_SECONDS)
+
+
+class AccessLog(SQLiteStore):
+    """SQLite-backed request counters per canonical molecule."""
+
+    def __init__(self, db_path: str = DB_PATH):
+        super().__init__(db_path)
+        # molecule_id -> [unwritten hits, drug name, last write time]
+        self._pending: Dict[str, list] = {}
+        self._pending_lock = threading.Lock()
+
+    def _configure(self, conn: sqlite3.Connection):
+        conn.create_function("decay", 2, _decay, deterministic=True)
+
+    def _init_schema(self):
+        with self._transaction() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS report_access (
+                    molecule_id TEXT PRIMARY KEY,
+                    drug_name   TEXT NOT NULL,
+                    hits        INTEGER NOT NULL,
+                    score       REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )
+            """)
+
+    def record(self, molecule_id: str, drug_name: str):
+        """Counts one request; written now unless this molecule was written within the interval."""
+        now = time.time()
+        with self._pending_lock:
+            pending = self._pending.setdefault(molecule_id, [0, drug_name, 0.0])
+            pending[0] += 1
+            pending[1] = drug_name
+            if now - pending[2] < RECORD_INTERVAL_SECONDS:
+                return
+            hits = pending[0]
+            pending[0] = 0
+            pending[2] = now
+        self._write(molecule_id, drug_name, hits, now)
+
+    def flush(self):
+        """Writes all buffered hits."""
+        now = time.time()
+        with self._pending_lock:
+            batch = [(molecule_id, p[1], p[0]) for molecule_id, p in self._pending.items() if p[0]]
+            for molecule_id, _, _ in batch:
+                self._pending[molecule_id][0] = 0
+                self._pending[molecule_id][2] = now
+        for molecule_id, drug_name, hits in batch:
+            self._write(molecule_id, drug_name, hits, now)
+
+    def _write(self, molecule_id: str, drug_name: str, hits: int, now: float):
+        with self._transaction() as conn:
+            conn.execute(
+                """
+                INSERT INTO report_access VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (molecule_id) DO UPDATE SET
+                    drug_name = excluded.drug_name,
+                    hits = hits + excluded.hits,
+                    score = decay(score, excluded.last_access - last_access) + excluded.score,
+                    last_access = excluded.last_access
+                """,
+                (molecule_id, drug_name, hits, float(hits), now),
+            )
+
+    def top(self, limit: int = 50) -> List[dict]:
+        """Most requested drugs by decayed score, highest first."""
+        self.flush()
+        now = time.time()
+        rows = self._connect().execute(
+            "SELECT molecule_id, drug_name, hits, score, last_access FROM report_access"
+        ).fetchall()
+        stats = [
+            {
+                "molecule_id": molecule_id,
+                "drug_name": drug_name,
+                "hits": hits,
+                "score": round(_decay(score, now - last_access), 3),
+                "last_access": last_access,
+            }
+            for molecule_id, drug_name, hits, score, last_access in rows
+        ]
+        stats.sort(key=lambda s: s["score"], reverse=True)
+        return stats[:limit]
+
+
+_access_log = None
+
+
+def get_access_log() -> AccessLog:
+    """Returns the process-wide AccessLog instance."""
+    global _access_log
+    if _access_log is None:
+        _access_log = AccessLog()
+    return _access_log
@@ -0,0 +1,311 @@
+"""
+Analytics Store
+Portfolio-wide views over every analyzed drug (top indications, trials by
+condition/phase/status, research topics, potential-score leaderboards),
+kept as materialized aggregates in SQLite next to the report store.
+
+Aggregates are maintained incrementally: when a drug's report is produced
+or refreshed, that drug's previous contribution is subtracted and the new
+one added, in a single transaction. Dashboard queries only read the small,
+indexed aggregate tables, so they stay fast however many reports exist.
+"""
+import sqlite3
+from datetime import datetime, timezone
+from typing import Dict, List, Tuple
+
+from src.storage.report_store import DB_PATH
+from src.storage.database import SQLiteStore
+
+FACT_DIMENSIONS = ("condition", "phase", "status", "topic", "paper_year")
+
+
+def _key(value) -> str:
+    return " ".join(str(value).lower().split())
+
+
+def _report_facts(report) -> Dict[Tuple[str, str], Tuple[str, int]]:
+    """(dimension, key) -> (label, count) for everything the report contributes."""
+    facts = {}
+
+    def add(dimension, value, count=1):
+        if value in (None, ""):
+            return
+        k = (dimension, _key(value))
+        label, total = facts.get(k, (str(value), 0))
+        facts[k] = (label, total + count)
+
+    charts = report.visualization_data.charts
+    for condition, count in report.clinical_trials.trials_by_disease.items():
+        add("condition", condition, count)
+    # The chart series count every trial found; key_trials is truncated.
+    for phase, count in (charts.get("trials_by_phase") or {}).items():
+        add("phase", phase, count)
+    for status, count in (charts.get("trials_by_status") or {}).items():
+        add("status", status, count)
+    for topic in report.research_papers.key_topics:
+        add("topic", topic)
+    for paper in report.research_papers.top_papers:
+        if paper.year:
+            add("paper_year", paper.year)
+    return facts
+
+
+class AnalyticsStore(SQLiteStore):
+    """Incrementally maintained cross-report aggregates."""
+
+    def __init__(self, db_path: str = DB_PATH):
+        super().__init__(db_path)
+
+    def _init_schema(self):
+        with self._transaction() as conn:
+            # Per-drug contributions, kept so a refresh can subtract them.
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS analytics_drugs (
+                    molecule_id          TEXT PRIMARY KEY,
+                    drug_name            TEXT NOT NULL,
+                    total_trials         INTEGER NOT NULL,
+                    total_papers         INTEGER NOT NULL,
+                    total_patents        INTEGER NOT NULL,
+                    top_indication       TEXT,
+                    top_potential_score  REAL NOT NULL,
+                    updated_at           TEXT NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_analytics_drugs_score ON analytics_drugs (top_potential_score DESC)")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS analytics_drug_facts (
+                    molecule_id TEXT NOT NULL,
+                    dimension   TEXT NOT NULL,
+                    value_key   TEXT NOT NULL,
+                    count       INTEGER NOT NULL,
+                    PRIMARY KEY (molecule_id, dimension, value_key)
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS analytics_drug_indications (
+                    molecule_id             TEXT NOT NULL,
+                    disease_key             TEXT NOT NULL,
+                    disease                 TEXT NOT NULL,
+                    market_size_usd_billion REAL NOT NULL,
+                    potential_score         REAL NOT NULL,
+                    PRIMARY KEY (molecule_id, disease_key)
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_analytics_drug_indications_score ON analytics_drug_indications (potential_score DESC)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_analytics_drug_indications_disease ON analytics_drug_indications (disease_key)")
+
+            # Materialized aggregates read by the dashboard.
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS analytics_facts (
+                    dimension TEXT NOT NULL,
+                    value_key TEXT NOT NULL,
+                    label     TEXT NOT NULL,
+                    total     INTEGER NOT NULL,
+                    drugs     INTEGER NOT NULL,
+                    PRIMARY KEY (dimension, value_key)
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_analytics_facts_total ON analytics_facts (dimension, total DESC)")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS analytics_indications (
+                    disease_key         TEXT PRIMARY KEY,
+                    disease             TEXT NOT NULL,
+                    drugs               INTEGER NOT NULL,
+                    score_sum           REAL NOT NULL,
+                    max_potential_score REAL NOT NULL,
+                    market_size_usd_billion REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_analytics_indications_rank ON analytics_indications (drugs DESC, max_potential_score DESC)")
+
+    # --- Incremental maintenance ---
+
+    def _subtract(self, conn: sqlite3.Connection, molecule_id: str) -> List[str]:
+        """Removes a drug's previous contribution. Returns the disease keys it touched."""
+        for dimension, value_key, count in conn.execute(
+            "SELECT dimension, value_key, count FROM analytics_drug_facts WHERE molecule_id = ?",
+            (molecule_id,),
+        ).fetchall():
+            conn.execute(
+                "UPDATE analytics_facts SET total = total - ?, drugs = drugs - 1 WHERE dimension = ? AND value_key = ?",
+                (count, dimension, value_key),
+            )
+            conn.execute(
+                "DELETE FROM analytics_facts WHERE dimension = ? AND value_key = ? AND drugs <= 0",
+                (dimension, value_key),
+            )
+        conn.execute("DELETE FROM analytics_drug_facts WHERE molecule_id = ?", (molecule_id,))
+
+        touched = []
+        for disease_key, score in conn.execute(
+            "SELECT disease_key, potential_score FROM analytics_drug_indications WHERE molecule_id = ?",
+            (molecule_id,),
+        ).fetchall():
+            conn.execute(
+                "UPDATE analytics_indications SET drugs = drugs - 1, score_sum = score_sum - ? WHERE disease_key = ?",
+                (score, disease_key),
+            )
+            touched.append(disease_key)
+        conn.execute("DELETE FROM analytics_drug_indications WHERE molecule_id = ?", (molecule_id,))
+        return touched
+
+    def _recompute_indication_maxima(self, conn: sqlite3.Connection, disease_keys: List[str]):
+        # Max and market size cannot be decremented, so they are recomputed
+        # from the per-drug rows; the disease_key index keeps this cheap.
+        for disease_key in set(disease_keys):
+            row = conn.execute(
+                "SELECT MAX(potential_score), MAX(market_size_usd_billion) FROM analytics_drug_indications WHERE disease_key = ?",
+                (disease_key,),
+            ).fetchone()
+            if row[0] is None:
+                conn.execute("DELETE FROM analytics_indications WHERE disease_key = ?", (disease_key,))
+            else:
+                conn.execute(
+                    "UPDATE analytics_indications SET max_potential_score = ?, market_size_usd_billion = ? WHERE disease_key = ?",
+                    (row[0], row[1], disease_key),
+                )
+
+    def record_report(self, molecule_id: str, report):
+        """Replaces a drug's contribution to every aggregate with the given report."""
+        facts = _report_facts(report)
+
+        indications = {}
+        for ind in report.market_analysis.top_indications:
+            k = _key(ind.disease)
+            if k and (k not in indications or ind.potential_score > indications[k].potential_score):
+                indications[k] = ind
+        top = max(indications.values(), key=lambda ind: ind.potential_score, default=None)
+
+        with self._transaction() as conn:
+            touched = self._subtract(conn, molecule_id)
+
+            for (dimension, value_key), (label, count) in facts.items():
+                conn.execute(
+                    "INSERT INTO analytics_drug_facts VALUES (?, ?, ?, ?)",
+                    (molecule_id, dimension, value_key, count),
+                )
+                conn.execute(
+                    """
+                    INSERT INTO analytics_facts VALUES (?, ?, ?, ?, 1)
+                    ON CONFLICT (dimension, value_key)
+                    DO UPDATE SET total = total + excluded.total, drugs = drugs + 1
+                    """,
+                    (dimension, value_key, label, count),
+                )
+
+            for disease_key, ind in indications.items():
+                conn.execute(
+                    "INSERT INTO analytics_drug_indications VALUES (?, ?, ?, ?, ?)",
+                    (molecule_id, disease_key, ind.disease, ind.market_size_usd_billion, ind.potential_score),
+                )
+                conn.execute(
+                    """
+                    INSERT INTO analytics_indications VALUES (?, ?, 1, ?, ?, ?)
+                    ON CONFLICT (disease_key)
+                    DO UPDATE SET drugs = drugs + 1, score_sum = score_sum + excluded.score_sum
+                    """,
+                    (disease_key, ind.disease, ind.potential_score, ind.potential_score, ind.market_size_usd_billion),
+                )
+                touched.append(disease_key)
+
+            self._recompute_indication_maxima(conn, touched)
+
+            conn.execute(
+                "INSERT OR REPLACE INTO analytics_drugs VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    molecule_id,
+                    report.drug_name,
+                    report.clinical_trials.total_trials,
+                    report.research_papers.total_papers,
+                    report.patents.total_patents,
+                    top.disease if top else None,
+                    top.potential_score if top else 0.0,
+                    datetime.now(timezone.utc).isoformat(),
+                ),
+            )
+
+    def is_empty(self) -> bool:
+        return self._connect().execute("SELECT 1 FROM analytics_drugs LIMIT 1").fetchone() is None
+
+    # --- Queries ---
+
+    def _rows(self, sql: str, params: tuple = ()) -> List[dict]:
+        cursor = self._connect().execute(sql, params)
+        columns = [c[0] for c in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def top_indications(self, limit: int = 20) -> List[dict]:
+        """Indications proposed for the most drugs, best potential first."""
+        return self._rows(
+            """
+            SELECT disease, drugs, max_potential_score,
+                   ROUND(score_sum / drugs, 3) AS avg_potential_score,
+                   market_size_usd_billion
+            FROM analytics_indications
+            ORDER BY drugs DESC, max_potential_score DESC
+            LIMIT ?
+            """,
+            (limit,),
+        )
+
+    def facts(self, dimension: str, limit: int = 20) -> List[dict]:
+        """Totals across all drugs for one dimension (condition, phase, status, topic, paper_year)."""
+        if dimension not in FACT_DIMENSIONS:
+            raise ValueError(f"Unknown dimension '{dimension}'. Expected one of: {', '.join(FACT_DIMENSIONS)}")
+        return self._rows(
+            """
+            SELECT label AS value, total, drugs FROM analytics_facts
+            WHERE dimension = ?
+            ORDER BY total DESC
+            LIMIT ?
+            """,
+            (dimension, limit),
+        )
+
+    def leaderboard(self, limit: int = 20) -> List[dict]:
+        """Drugs ranked by their best indication's potential score."""
+        return self._rows(
+            """
+            SELECT molecule_id, drug_name, top_indication, top_potential_score,
+                   total_trials, total_papers, total_patents, updated_at
+            FROM analytics_drugs
+            ORDER BY top_potential_score DESC
+            LIMIT ?
+            """,
+            (limit,),
+        )
+
+    def indication_leaderboard(self, limit: int = 20) -> List[dict]:
+        """Individual drug/indication pairs ranked by potential score."""
+        return self._rows(
+            """
+            SELECT i.molecule_id, d.drug_name, i.disease, i.potential_score, i.market_size_usd_billion
+            FROM analytics_drug_indications i
+            JOIN analytics_drugs d ON d.molecule_id = i.molecule_id
+            ORDER BY i.potential_score DESC
+            LIMIT ?
+            """,
+            (limit,),
+        )
+
+    def summary(self) -> dict:
+        return self._rows(
+            """
+            SELECT COUNT(*) AS drugs,
+                   COALESCE(SUM(total_trials), 0) AS trials,
+                   COALESCE(SUM(total_papers), 0) AS papers,
+                   COALESCE(SUM(total_patents), 0) AS patents
+            FROM analytics_drugs
+            """
+        )[0]
+
+
+_analytics = None
+
+
+def get_analytics_store() -> AnalyticsStore:
+    """Returns the process-wide AnalyticsStore instance."""
+    global _analytics
+    if _analytics is None:
+        _analytics = AnalyticsStore()
+    return _analytics
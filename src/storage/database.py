@@ -0,0 +1,57 @@
+"""
+SQLite Base
+Shared connection and transaction handling for the SQLite-backed stores
+(reports, analytics, access log, worker coordination).
+
+Connections are per thread, since sqlite3 connections cannot be shared
+across threads and FastAPI runs sync handlers in a thread pool. They run
+in WAL mode so readers never block on writers across worker processes,
+and in autocommit mode: every write goes through _transaction(), which
+opens BEGIN IMMEDIATE so read-modify-write steps hold the write lock.
+"""
+import os
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+
+
+class SQLiteStore(ABC):
+    """Base class for stores backed by one SQLite database file."""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._local = threading.local()
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._init_schema()
+
+    @abstractmethod
+    def _init_schema(self):
+        """Creates the store's tables; runs once per instance."""
+
+    def _configure(self, conn: sqlite3.Connection):
+        """Hook for per-connection setup such as user-defined SQL functions."""
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._configure(conn)
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _transaction(self):
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        else:
+            conn.execute("COMMIT")
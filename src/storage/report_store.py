@@ -0,0 +1,186 @@
+"""
+Report Store
+Persists finished FinalReports so repeat requests for the same drug are a
+key lookup instead of a full pipeline run.
+
+Reports are keyed by (drug_key, config_hash). The config hash changes whenever
+the model, prompts or report schema change, so stale reports built with an
+older pipeline are never served. Each save appends a new version; only the
+last few versions per key are kept.
+
+A report's ETag is its content hash, which leaves out the links and build
+timestamp, so a rebuild that produced the same content still revalidates
+with a 304.
+"""
+import os
+import json
+import hashlib
+import zlib
+import orjson
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Iterator, Optional
+from src.knowledge.drug_index import canonical_id
+from src.storage.database import SQLiteStore
+
+DATA_DIR = os.getenv("PHARMAMIND_DATA_DIR", "data")
+DB_PATH = os.path.join(DATA_DIR, "pharmamind.db")
+REPORT_TTL_SECONDS = int(float(os.getenv("PHARMAMIND_REPORT_TTL_HOURS", "24")) * 3600)
+VERSIONS_TO_KEEP = 5
+COMPRESSION_LEVEL = 6
+
+
+def drug_key(drug_name: str) -> str:
+    """Store key for a user-supplied drug name: its canonical molecule ID."""
+    return canonical_id(drug_name)
+
+
+def config_hash(*parts: str) -> str:
+    """Stable short hash of everything that changes what a report looks like."""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()[:16]
+
+
+def content_hash(report) -> str:
+    """Hash of a FinalReport's content, excluding its links and timestamp."""
+    content = report.model_dump(exclude={"report_links"})
+    encoded = json.dumps(content, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()[:32]
+
+
+def serialize_report(report) -> bytes:
+    """Serializes a FinalReport to compact JSON bytes."""
+    # patent_trend is Dict[int, int], so non-string keys must be allowed
+    return orjson.dumps(report.model_dump(), option=orjson.OPT_NON_STR_KEYS)
+
+
+def load_report(payload: bytes):
+    """Rebuilds a FinalReport from stored JSON bytes."""
+    from src.schemas.final_report_schema import FinalReport
+    return FinalReport.model_validate_json(payload)
+
+
+@dataclass
+class StoredReport:
+    drug_key: str
+    config_hash: str
+    version: int
+    etag: str
+    created_at: datetime
+    payload: bytes
+
+    @property
+    def age_seconds(self) -> float:
+        return (datetime.now(timezone.utc) - self.created_at).total_seconds()
+
+    def is_fresh(self, ttl_seconds: int = REPORT_TTL_SECONDS) -> bool:
+        return self.age_seconds < ttl_seconds
+
+
+class ReportStore(SQLiteStore):
+    """SQLite-backed, versioned store of compressed report payloads."""
+
+    def __init__(self, db_path: str = DB_PATH):
+        super().__init__(db_path)
+
+    def _init_schema(self):
+        with self._transaction() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS reports (
+                    drug_key    TEXT    NOT NULL,
+                    config_hash TEXT    NOT NULL,
+                    version     INTEGER NOT NULL,
+                    etag        TEXT    NOT NULL,
+                    created_at  TEXT    NOT NULL,
+                    payload     BLOB    NOT NULL,
+                    PRIMARY KEY (drug_key, config_hash, version)
+                )
+            """)
+
+    def get(self, drug_key: str, config_hash: str) -> Optional[StoredReport]:
+        """Returns the latest stored version for the key, or None."""
+        row = self._connect().execute(
+            """
+            SELECT version, etag, created_at, payload FROM reports
+            WHERE drug_key = ? AND config_hash = ?
+            ORDER BY version DESC LIMIT 1
+            """,
+            (drug_key, config_hash),
+        ).fetchone()
+        if row is None:
+            return None
+        version, etag, created_at, payload = row
+        return StoredReport(
+            drug_key=drug_key,
+            config_hash=config_hash,
+            version=version,
+            etag=etag,
+            created_at=datetime.fromisoformat(created_at),
+            payload=zlib.decompress(payload),
+        )
+
+    def put(self, drug_key: str, config_hash: str, payload: bytes, etag: Optional[str] = None) -> StoredReport:
+        """
+        Stores payload as a new version and prunes old versions. The ETag
+        defaults to a hash of the payload bytes.
+        """
+        etag = etag or '"' + hashlib.sha256(payload).hexdigest()[:32] + '"'
+        # HTTP dates have second resolution, so drop microseconds to keep
+        # If-Modified-Since comparisons exact.
+        created_at = datetime.now(timezone.utc).replace(microsecond=0)
+        compressed = zlib.compress(payload, COMPRESSION_LEVEL)
+
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT MAX(version) FROM reports WHERE drug_key = ? AND config_hash = ?",
+                (drug_key, config_hash),
+            ).fetchone()
+            version = (row[0] or 0) + 1
+            conn.execute(
+                "INSERT INTO reports VALUES (?, ?, ?, ?, ?, ?)",
+                (drug_key, config_hash, version, etag, created_at.isoformat(), compressed),
+            )
+            conn.execute(
+                "DELETE FROM reports WHERE drug_key = ? AND config_hash = ? AND version <= ?",
+                (drug_key, config_hash, version - VERSIONS_TO_KEEP),
+            )
+
+        return StoredReport(
+            drug_key=drug_key,
+            config_hash=config_hash,
+            version=version,
+            etag=etag,
+            created_at=created_at,
+            payload=payload,
+        )
+
+    def iter_latest(self, config_hash: str) -> Iterator[StoredReport]:
+        """Yields the latest stored version of every drug for a config hash."""
+        rows = self._connect().execute(
+            """
+            SELECT drug_key, MAX(version) FROM reports
+            WHERE config_hash = ? GROUP BY drug_key
+            """,
+            (config_hash,),
+        ).fetchall()
+        for key, _ in rows:
+            stored = self.get(key, config_hash)
+            if stored is not None:
+                yield stored
+
+    def save_report(self, drug_key: str, config_hash: str, report) -> StoredReport:
+        return self.put(drug_key, config_hash, serialize_report(report), f'"{content_hash(report)}"')
+
+
+_store = None
+
+
+def get_report_store() -> ReportStore:
+    """Returns the process-wide ReportStore instance."""
+    global _store
+    if _store is None:
+        _store = ReportStore()
+    return _store
@@ -2,6 +2,8 @@ import requests
 import time
 import json
 from typing import List, Dict, Any
+from src.coordination.coordinator import get_coordinator, shared_cache, NCBI_API_KEY
+from src.knowledge.drug_index import resolve, canonical_id
 
 HEADERS = {
     "User-Agent": "PharmaMind_Agent/1.0 (mailto:your_email@example.com)"
@@ -11,11 +13,17 @@ PUBMED_ESEARCH_URL = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/esearch.fcgi
 PUBMED_ESUMMARY_URL = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/esummary.fcgi"
 PUBMED_BASE_URL = "https://pubmed.ncbi.nlm.nih.gov/"
 MAX_PUBMED_RESULTS = 5
+UPSTREAM_CACHE_TTL_SECONDS = 24 * 3600
 
+def _or_query(drug_name: str) -> str:
+    """All useful spellings of the drug as one OR query, e.g. ("metformin" OR "glucophage")."""
+    return "(" + " OR ".join(f'"{term}"' for term in resolve(drug_name).query_terms) + ")"
+
+@shared_cache("pubmed", UPSTREAM_CACHE_TTL_SECONDS, key_func=canonical_id)
 def search_pubmed(drug_name: str) -> List[Dict[str, Any]]:
     print(f"[Tool] Searching PubMed for: {drug_name}")
     
-    query = f"({drug_name}) AND (repurposing OR new indication OR novel therapy OR anti-tumor OR neuroprotection)"
+    query = f"{_or_query(drug_name)} AND (repurposing OR new indication OR novel therapy OR anti-tumor OR neuroprotection)"
     
     articles = []
     try:
@@ -26,8 +34,10 @@ def search_pubmed(drug_name: str) -> List[Dict[str, Any]]:
             "sort": "relevance",
             "retmode": "json"
         }
+        if NCBI_API_KEY:
+            search_params["api_key"] = NCBI_API_KEY
         
-        time.sleep(0.4)
+        get_coordinator().acquire("ncbi")
         response = requests.get(PUBMED_ESEARCH_URL, params=search_params, headers=HEADERS)
         response.raise_for_status()
         
@@ -43,8 +53,10 @@ def search_pubmed(drug_name: str) -> List[Dict[str, Any]]:
             "id": ",".join(id_list),
             "retmode": "json"
         }
+        if NCBI_API_KEY:
+            summary_params["api_key"] = NCBI_API_KEY
         
-        time.sleep(0.4)
+        get_coordinator().acquire("ncbi")
         response = requests.get(PUBMED_ESUMMARY_URL, params=summary_params, headers=HEADERS)
         response.raise_for_status()
         
@@ -73,16 +85,18 @@ def search_pubmed(drug_name: str) -> List[Dict[str, Any]]:
 CLINICAL_TRIALS_URL = "https://clinicaltrials.gov/api/v2/studies"
 MAX_TRIALS_RESULTS = 5
 
+@shared_cache("clinicaltrials", UPSTREAM_CACHE_TTL_SECONDS, key_func=canonical_id)
 def search_clinical_trials(drug_name: str) -> List[Dict[str, Any]]:
     print(f"[Tool] Searching ClinicalTrials.gov for: {drug_name}")
     
     trials = []
     try:
         params = {
-            "query.cond": drug_name,
+            "query.intr": _or_query(drug_name),
             "pageSize": MAX_TRIALS_RESULTS
         }
         
+        get_coordinator().acquire("clinicaltrials")
         response = requests.get(CLINICAL_TRIALS_URL, params=params, headers=HEADERS, timeout=30)
         
         if response.status_code != 200:
@@ -141,7 +155,7 @@ def search_patents(drug_name: str) -> List[Dict[str, Any]]:
     print(f"[Tool] Searching Patents (MOCK) for: {drug_name}")
     time.sleep(0.2)
     
-    if drug_name.lower() == "metformin":
+    if canonical_id(drug_name) == "metformin":
         return [
             {"title": "Novel Metformin Formulation for Oncology Applications", "year": 2023, "applicant": "Pfizer Inc.", "url": "https://www.lens.org/patent/XXXXXX"},
             {"title": "Metformin-based Combination Therapy for Alzheimer's", "year": 2022, "applicant": "AstraZeneca", "url": "https://www.lens.org/patent/YYYYYY"},
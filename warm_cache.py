@@ -0,0 +1,31 @@
+import argparse
+from src.orchestration.cache_warmer import (
+    run_once, run_forever, load_watchlist, WarmBudget, WATCHLIST_PATH,
+    DAILY_LLM_BUDGET, DAILY_UPSTREAM_BUDGET
+)
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Refresh PharmaMind reports for watched and frequently requested drugs before they expire."
+    )
+    parser.add_argument("drugs", nargs="*", help="Drugs to warm in addition to the watchlist")
+    parser.add_argument("--watchlist", default=WATCHLIST_PATH, help="File with one drug name per line")
+    parser.add_argument("--once", action="store_true", help="Run a single warming pass now, ignoring the off-peak window")
+    parser.add_argument("--dry-run", action="store_true", help="Print the plan without refreshing anything")
+    parser.add_argument("--llm-budget", type=int, default=DAILY_LLM_BUDGET, help="Max LLM calls per day")
+    parser.add_argument("--upstream-budget", type=int, default=DAILY_UPSTREAM_BUDGET, help="Max PubMed/ClinicalTrials calls per day")
+    args = parser.parse_args()
+
+    budget = WarmBudget(llm_budget=args.llm_budget, upstream_budget=args.upstream_budget)
+
+    if args.once or args.dry_run:
+        watchlist = load_watchlist(args.watchlist) + args.drugs
+        refreshed = run_once(watchlist, budget, dry_run=args.dry_run)
+        print(f"Refreshed {refreshed} reports.")
+    else:
+        if args.drugs:
+            print("Extra drugs are only used with --once; add them to the watchlist file instead.")
+        run_forever(args.watchlist, budget)
+
+if __name__ == "__main__":
+    main()